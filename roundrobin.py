@@ -1,29 +1,76 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import itertools
+from collections import Counter
 import random
-from typing import List, Set, Tuple, Optional
-from dataclasses import dataclass
+import os
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Set, Tuple, Optional, Sequence
+from dataclasses import dataclass, asdict
 import plotly.express as px
 import plotly.graph_objects as go
 from io import BytesIO
+import xlsxwriter
 import logging
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Optional - fall back to the pure Python search
+    NUMBA_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Streamlit caches are shared by every session; bound each cached function's entries
+CACHE_MAX_ENTRIES = 16
+
+# The process pool is opt-in (GroupConfig.n_jobs) and the app never enables it: starting
+# workers costs seconds, while a typical in-process search takes milliseconds, so it only
+# pays off for large library runs. Below this many student-weeks it is skipped anyway.
+PARALLEL_MIN_WORKLOAD = 200
+
+# Adaptive random search budget: solved weeks needed before shrinking it, and a floor.
+# Attempts-to-solve are roughly geometric, so mean * ln(100) misses ~1% of solvable weeks
+MIN_BUDGET_SAMPLES = 5
+ADAPTIVE_BUDGET_FACTOR = 5
+MIN_ATTEMPT_BUDGET = 200
+
+@dataclass(eq=True, frozen=True)
 class GroupConfig:
-    """Configuration for group generation"""
+    """Configuration for group generation (frozen so it can key Streamlit caches)"""
     student_count: int
     group_size: int
     weeks: int
-    student_names: Optional[List[str]] = None
+    student_names: Optional[Sequence[str]] = None
     max_attempts_per_week: int = 1000
+    max_construction_attempts: int = 5
+    # Worker processes for the Python random search; None stays in-process, -1 uses all
+    # usable cores. Ignored when Numba is installed - the compiled kernel takes precedence
+    n_jobs: Optional[int] = None
     
     def __post_init__(self):
+        if self.student_names is not None:
+            object.__setattr__(self, 'student_names', tuple(self.student_names))
         self.validate()
+        
+        # Group layout is fixed for a config - first 'remainder' groups get an extra student
+        base_groups = self.student_count // self.group_size
+        remainder = self.student_count % self.group_size
+        group_sizes = tuple(
+            self.group_size + 1 if i < remainder else self.group_size for i in range(base_groups)
+        )
+        object.__setattr__(self, '_group_sizes', group_sizes)
+        object.__setattr__(self, '_group_offsets', tuple(itertools.accumulate((0,) + group_sizes[:-1])))
+        
+        # Display name for every student index, looked up by get_student_name
+        name_cache = (tuple(self.student_names) if self.student_names
+                      else tuple(f"Student {i + 1}" for i in range(self.student_count)))
+        object.__setattr__(self, '_name_cache', name_cache)
     
     def validate(self):
         """Validate configuration parameters"""
@@ -42,31 +89,94 @@ class GroupGenerator:
     def __init__(self, config: GroupConfig):
         self.config = config
         self.students = list(range(config.student_count))
-        self.previous_week_pairs: Set[Tuple[int, int]] = set()  # Only track previous week
-        self.all_historical_pairs: Set[Tuple[int, int]] = set()  # For statistics only
+        self.n = config.student_count
+        # Previous week pairs encoded as i * n + j (i < j) - compact to pickle for workers
+        self._prev_frozen: frozenset = frozenset()
+        # Previous week partners per student as a bitmask (bit j set if paired with j)
+        self.prev_neighbors: List[int] = [0] * self.n
+        # Symmetric boolean matrix of the same pairs, only built for the compiled search
+        self.prev_adj: Optional[np.ndarray] = None
+        self.all_historical_pairs: Set[int] = set()  # Encoded pairs, for statistics only
+        self._attempts_history: List[int] = []  # Attempts each solved week needed to reach zero conflicts
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stop_event = None
         
     def generate_groups(self) -> List[List[List[int]]]:
         """Generate groups for all weeks"""
         week_groups = []
         
-        for week in range(self.config.weeks):
-            groups = self._generate_week_groups()
-            week_groups.append(groups)
-            self._update_pair_history(groups)
+        try:
+            for week in range(self.config.weeks):
+                groups = self._generate_week_groups()
+                week_groups.append(groups)
+                self._update_pair_history(groups)
+        finally:
+            self._shutdown_executor()
             
         return week_groups
     
     def _generate_week_groups(self) -> List[List[int]]:
         """Generate groups for a single week, avoiding previous week pairs"""
+        if not self._prev_frozen:  # First week - nothing to avoid
+            return self._create_properly_sized_groups()
+        
+        # Build a conflict-free week directly; fall back to random search if that fails
+        for _ in range(self.config.max_construction_attempts):
+            groups = self._construct_groups_no_conflict()
+            if groups is not None:
+                return groups
+        
+        budget = self._attempt_budget()
+        # The compiled kernel beats the process pool, so it wins over an explicit n_jobs
+        if NUMBA_AVAILABLE:
+            best_score, best_groups, attempts_used = self._numba_random_search(budget)
+        elif self._use_parallel_search():
+            best_score, best_groups, attempts_used = self._parallel_random_search(budget)
+        else:
+            best_score, best_groups, attempts_used = self._random_search(budget)
+        
+        # Only solved weeks say how long a solve takes; unsolved ones are just truncated
+        if best_score == 0:
+            self._attempts_history.append(attempts_used)
+        
+        # Return best groups found, or create new ones if none found
+        return best_groups if best_groups else self._create_properly_sized_groups()
+    
+    def _attempt_budget(self) -> int:
+        """Random search attempts for this week, adapted to how quickly earlier weeks were solved.
+        
+        Only kicks in after several solved weeks, and never drops below twice the
+        slowest solve seen so far, so a few cheap early solves cannot starve a harder
+        week. max_attempts_per_week stays the ceiling.
+        """
+        history = self._attempts_history
+        if len(history) < MIN_BUDGET_SAMPLES:
+            return self.config.max_attempts_per_week
+        
+        mean_attempts = sum(history) / len(history)
+        budget = max(MIN_ATTEMPT_BUDGET, int(ADAPTIVE_BUDGET_FACTOR * mean_attempts), 2 * max(history))
+        return min(self.config.max_attempts_per_week, budget)
+    
+    def _random_search(self, attempts: int, stop_event=None) -> Tuple[float, Optional[List[List[int]]], int]:
+        """Try independent random groupings and return the best (score, groups, attempts used)"""
         best_groups = None
         best_score = float('inf')
+        attempts_used = 0
+        perms = self._permutation_batch(attempts)
         
-        for attempt in range(self.config.max_attempts_per_week):
-            groups = self._create_properly_sized_groups()
-            score = self._calculate_previous_week_conflicts(groups)
+        for attempt, order in enumerate(perms):
+            # Another walk already found a perfect solution
+            if stop_event is not None and stop_event.is_set():
+                break
+            
+            groups = self._split_into_groups(order.tolist())
+            score = self._calculate_previous_week_conflicts(groups, cutoff=best_score)
+            attempts_used = attempt + 1
             
             if score == 0:  # Perfect solution - no previous week conflicts
-                return groups
+                if stop_event is not None:
+                    stop_event.set()
+                return score, groups, attempts_used
             elif score < best_score:
                 best_score = score
                 best_groups = groups
@@ -75,81 +185,221 @@ class GroupGenerator:
             if attempt > 200 and best_score <= 3:
                 break
         
-        # Return best groups found, or create new ones if none found
-        return best_groups if best_groups else self._create_properly_sized_groups()
+        return best_score, best_groups, attempts_used
     
-    def _create_properly_sized_groups(self) -> List[List[int]]:
-        """Create groups with proper sizing - never smaller than group_size"""
-        students_copy = self.students.copy()
-        random.shuffle(students_copy)
+    def _numba_random_search(self, attempts: int) -> Tuple[float, Optional[List[List[int]]], int]:
+        """Score the whole attempt budget in the compiled kernel and return the best (score, groups, attempts used)"""
+        perms = self._permutation_batch(attempts)
+        if len(perms) == 0:
+            return float('inf'), None, 0
+        
+        sizes = np.array(self.config._group_sizes, dtype=np.int32)
+        score, best = _search_attempts(perms, sizes, self.prev_adj)
+        # argmin picks the first zero, matching where the Python search would stop
+        attempts_used = int(best) + 1 if score == 0 else len(perms)
+        return int(score), self._split_into_groups(perms[best].tolist()), attempts_used
+    
+    def _permutation_batch(self, attempts: int) -> np.ndarray:
+        """Draw one random ordering of the students per attempt in a single call"""
+        rng = np.random.default_rng(random.getrandbits(64))
+        orders = np.tile(np.arange(self.n, dtype=np.int32), (attempts, 1))
+        return rng.permuted(orders, axis=1)
+    
+    def _n_jobs(self) -> int:
+        """Number of worker processes to use for random search, capped at the usable cores"""
+        if self.config.n_jobs is None:
+            return 1
+        usable = _usable_cpu_count()
+        return usable if self.config.n_jobs < 0 else max(1, min(self.config.n_jobs, usable))
+    
+    def _use_parallel_search(self) -> bool:
+        """Only parallelize when the workload outweighs process pool overhead"""
+        workload = self.config.student_count * self.config.weeks
+        return self._n_jobs() > 1 and workload >= PARALLEL_MIN_WORKLOAD
+    
+    def _parallel_random_search(self, attempts: int) -> Tuple[float, Optional[List[List[int]]], int]:
+        """Split the attempt budget into independent walks run across processes"""
+        if attempts <= 0:
+            return float('inf'), None, 0
+        
+        n_jobs = self._n_jobs()
+        if self._executor is None:
+            # Never fork: Streamlit calls this from a thread of a multithreaded server
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            self._stop_event = context.Event()
+            self._executor = ProcessPoolExecutor(
+                max_workers=n_jobs,
+                mp_context=context,
+                initializer=_init_search_worker,
+                initargs=(self._stop_event,)
+            )
+        self._stop_event.clear()
+        
+        base, extra = divmod(attempts, n_jobs)
+        chunks = [base + 1 if i < extra else base for i in range(n_jobs)]
+        worker = _importable_search_worker()
+        config_fields = asdict(self.config)
+        futures = [
+            self._executor.submit(worker, config_fields, self._prev_frozen,
+                                  chunk, random.getrandbits(32))
+            for chunk in chunks if chunk > 0
+        ]
         
-        base_groups = self.config.student_count // self.config.group_size
-        remainder = self.config.student_count % self.config.group_size
+        results = [future.result() for future in futures]
+        best_score, best_groups, _ = min(results, key=lambda result: result[0])
+        # Count the work of every walk, as a single process would have done it all
+        return best_score, best_groups, sum(result[2] for result in results)
+    
+    def _shutdown_executor(self):
+        """Release worker processes once generation is finished"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._stop_event = None
+    
+    def _construct_groups_no_conflict(self) -> Optional[List[List[int]]]:
+        """Pack students into groups so that no previous week pair is reunited.
+        
+        Students are placed in random order into the first group with free capacity
+        and no previous week partner. If no group fits, an augmenting path relocates
+        a blocking member into another group. Returns None if a student cannot be placed.
+        """
+        capacities = self.config._group_sizes
+        neighbors = self.prev_neighbors
         
-        groups = []
-        start_idx = 0
+        groups: List[List[int]] = [[] for _ in capacities]
+        masks = [0] * len(capacities)  # Bitmask of each group's members
         
-        # Create groups - first 'remainder' groups get an extra student
-        for i in range(base_groups):
-            if i < remainder:
-                # This group gets an extra student
-                group_size = self.config.group_size + 1
-            else:
-                # This group gets the standard size
-                group_size = self.config.group_size
+        def place(student: int, visited: Set[int]) -> bool:
+            partners = neighbors[student]
+            # Direct fit: first group with room and no conflict
+            for group_idx, group in enumerate(groups):
+                if (group_idx not in visited and len(group) < capacities[group_idx]
+                        and not partners & masks[group_idx]):
+                    group.append(student)
+                    masks[group_idx] |= 1 << student
+                    return True
             
-            end_idx = start_idx + group_size
-            groups.append(students_copy[start_idx:end_idx])
-            start_idx = end_idx
+            # Augmenting path: move a single blocking member elsewhere to make room
+            for group_idx, group in enumerate(groups):
+                if group_idx in visited:
+                    continue
+                blocking = partners & masks[group_idx]
+                if blocking.bit_count() > 1:
+                    continue
+                if blocking:
+                    candidates = [blocking.bit_length() - 1]
+                elif len(group) >= capacities[group_idx]:
+                    candidates = list(group)
+                else:
+                    continue
+                
+                visited.add(group_idx)
+                for member in candidates:
+                    group.remove(member)
+                    masks[group_idx] ^= 1 << member
+                    if place(member, visited):
+                        group.append(student)
+                        masks[group_idx] |= 1 << student
+                        return True
+                    group.append(member)
+                    masks[group_idx] |= 1 << member
+            return False
+        
+        students_copy = self.students.copy()
+        random.shuffle(students_copy)
+        for student in students_copy:
+            if not place(student, set()):
+                return None
         
         return groups
     
-    def _calculate_previous_week_conflicts(self, groups: List[List[int]]) -> int:
-        """Calculate how many pairs conflict with previous week only"""
-        if not self.previous_week_pairs:  # First week has no conflicts
-            return 0
-            
+    def _create_properly_sized_groups(self) -> List[List[int]]:
+        """Create groups with proper sizing - never smaller than group_size"""
+        students_copy = self.students.copy()
+        random.shuffle(students_copy)
+        return self._split_into_groups(students_copy)
+    
+    def _split_into_groups(self, order: List[int]) -> List[List[int]]:
+        """Cut an ordering of students into consecutive properly sized groups"""
+        return [order[offset:offset + size]
+                for offset, size in zip(self.config._group_offsets, self.config._group_sizes)]
+    
+    def _calculate_previous_week_conflicts(self, groups: List[List[int]], cutoff: float = float('inf')) -> int:
+        """Calculate how many pairs conflict with previous week only.
+        
+        Stops as soon as the count reaches cutoff - the grouping can no longer beat it.
+        """
+        neighbors = self.prev_neighbors
         conflicts = 0
         for group in groups:
-            for pair in itertools.combinations(group, 2):
-                sorted_pair = tuple(sorted(pair))
-                if sorted_pair in self.previous_week_pairs:
-                    conflicts += 1
+            mask = 0
+            for student in group:
+                mask |= 1 << student
+            group_conflicts = 0
+            for student in group:
+                group_conflicts += (neighbors[student] & mask).bit_count()
+            conflicts += group_conflicts // 2  # Each pair is seen from both ends
+            if conflicts >= cutoff:
+                break
         return conflicts
     
     def _update_pair_history(self, groups: List[List[int]]):
         """Update pair history - only keep previous week pairs for constraint"""
-        # Clear previous week pairs and set current week as previous
-        self.previous_week_pairs.clear()
+        # Replace previous week pairs with the current week
+        pairs = frozenset(
+            self._encode_pair(a, b) for group in groups for a, b in itertools.combinations(group, 2)
+        )
+        self.all_historical_pairs |= pairs  # Keep all for statistics
+        self._load_previous_week_pairs(pairs)
+    
+    def _load_previous_week_pairs(self, pairs: frozenset, build_adj: Optional[bool] = None):
+        """Rebuild the neighbor masks (and adjacency matrix if build_adj) from encoded previous week pairs"""
+        n = self.n
+        self._prev_frozen = pairs
         
-        for group in groups:
-            pairs = list(itertools.combinations(group, 2))
-            for pair in pairs:
-                sorted_pair = tuple(sorted(pair))
-                self.previous_week_pairs.add(sorted_pair)
-                self.all_historical_pairs.add(sorted_pair)  # Keep all for statistics
+        neighbors = [0] * n
+        for key in pairs:
+            a, b = divmod(key, n)
+            neighbors[a] |= 1 << b
+            neighbors[b] |= 1 << a
+        self.prev_neighbors = neighbors
+        
+        if build_adj is None:
+            build_adj = NUMBA_AVAILABLE
+        if not build_adj:
+            return
+        adj = np.zeros(n * n, dtype=bool)
+        adj[np.fromiter(pairs, dtype=np.int64, count=len(pairs))] = True
+        adj = adj.reshape(n, n)
+        self.prev_adj = adj | adj.T
+    
+    def _encode_pair(self, i: int, j: int) -> int:
+        """Encode an unordered pair as a single int"""
+        return i * self.n + j if i < j else j * self.n + i
     
     def get_pair_statistics(self, week_groups: List[List[List[int]]]) -> dict:
-        """Calculate statistics about pair repetitions"""
-        all_pairs_count = {}
+        """Calculate statistics about pair repetitions.
+        
+        Pairs are keyed as low * n + high; decode with divmod(key, n).
+        """
+        n = self.n
+        all_pairs_count = Counter()
         consecutive_repeats = 0
         
         # Track all pairs and consecutive repeats
         previous_week_pairs_for_stats = set()
         
-        for week, groups in enumerate(week_groups):
-            current_week_pairs = set()
-            
-            for group in groups:
-                for pair in itertools.combinations(group, 2):
-                    sorted_pair = tuple(sorted(pair))
-                    all_pairs_count[sorted_pair] = all_pairs_count.get(sorted_pair, 0) + 1
-                    current_week_pairs.add(sorted_pair)
-            
-            # Check for consecutive repeats
-            if week > 0:
-                consecutive_repeats += len(current_week_pairs.intersection(previous_week_pairs_for_stats))
+        for groups in week_groups:
+            # Sorted groups yield each pair already ordered as (low, high)
+            current_week_pairs = {
+                a * n + b for group in groups for a, b in itertools.combinations(sorted(group), 2)
+            }
+            all_pairs_count.update(current_week_pairs)
             
+            # Check for consecutive repeats (empty set for the first week)
+            consecutive_repeats += len(current_week_pairs & previous_week_pairs_for_stats)
             previous_week_pairs_for_stats = current_week_pairs
         
         repeated_pairs = {pair: count for pair, count in all_pairs_count.items() if count > 1}
@@ -165,67 +415,130 @@ class GroupGenerator:
     
     def get_expected_group_sizes(self) -> List[int]:
         """Calculate expected group sizes"""
-        base_groups = self.config.student_count // self.config.group_size
-        remainder = self.config.student_count % self.config.group_size
-        
-        sizes = []
-        for i in range(base_groups):
-            if i < remainder:
-                sizes.append(self.config.group_size + 1)
-            else:
-                sizes.append(self.config.group_size)
+        return sorted(self.config._group_sizes, reverse=True)  # Show larger groups first
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _score_assignment(assignment, sizes, adj_matrix):
+        """Count previous week conflicts for one flat assignment.
         
-        return sorted(sizes, reverse=True)  # Show larger groups first
+        Groups are laid out back to back in assignment, using the lengths in sizes.
+        """
+        score = 0
+        start = 0
+        for size in sizes:
+            for a in range(start, start + size):
+                for b in range(a + 1, start + size):
+                    if adj_matrix[assignment[a], assignment[b]]:
+                        score += 1
+            start += size
+        return score
+    
+    # Serial on purpose: Streamlit calls this from concurrent session threads, which
+    # Numba's parallel threading layers do not tolerate
+    @njit(cache=True)
+    def _search_attempts(perms, sizes, adj_matrix):
+        """Score every permutation row and return (best score, best row index)"""
+        attempts = perms.shape[0]
+        scores = np.empty(attempts, dtype=np.int64)
+        for attempt in range(attempts):
+            scores[attempt] = _score_assignment(perms[attempt], sizes, adj_matrix)
+        best = np.argmin(scores)
+        return scores[best], best
+
+def _usable_cpu_count() -> int:
+    """CPUs this process may run on (respects affinity and container CPU sets)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _importable_search_worker():
+    """Search worker referenced through an importable module.
+    
+    `streamlit run` executes this file as __main__, which spawned workers cannot
+    unpickle functions from, so resolve the worker through the module's file name.
+    """
+    if __name__ != '__main__':
+        return _random_search_worker
+    module_name = os.path.splitext(os.path.basename(__file__))[0]
+    return importlib.import_module(module_name)._random_search_worker
+
+# Shared by all search workers so one perfect solution stops the others early
+_search_stop_event = None
+
+def _init_search_worker(stop_event):
+    """Process pool initializer - keep the shared stop event for this worker"""
+    global _search_stop_event
+    _search_stop_event = stop_event
+
+def _random_search_worker(config_fields: dict, prev_pairs: frozenset,
+                          attempts: int, seed: int) -> Tuple[float, Optional[List[List[int]]], int]:
+    """Run one independent random walk in a worker process"""
+    random.seed(seed)
+    generator = GroupGenerator(GroupConfig(**config_fields))
+    generator._load_previous_week_pairs(prev_pairs, build_adj=False)
+    return generator._random_search(attempts, _search_stop_event)
+
+# Immutable week -> group -> students nesting, hashable for Streamlit caches
+WeekGroups = Sequence[Sequence[Sequence[int]]]
+
+def freeze_week_groups(week_groups: List[List[List[int]]]) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """Convert generated groups to nested tuples"""
+    return tuple(tuple(tuple(group) for group in groups) for groups in week_groups)
 
 def get_student_name(student_idx: int, config: GroupConfig) -> str:
     """Get student name - either from names list or default numbering"""
-    if config.student_names:
-        return config.student_names[student_idx]
-    else:
-        return f"Student {student_idx + 1}"
+    return config._name_cache[student_idx]
 
-def create_results_dataframe(week_groups: List[List[List[int]]], config: GroupConfig) -> pd.DataFrame:
+def create_results_dataframe(week_groups: WeekGroups, config: GroupConfig) -> pd.DataFrame:
     """Create a pandas DataFrame with the results"""
-    data = []
-    
-    for student in range(config.student_count):
-        row = {'Student': get_student_name(student, config)}
-        for week in range(config.weeks):
-            # Find which group this student is in for this week
-            group_num = '-'
-            for group_idx, group in enumerate(week_groups[week]):
-                if student in group:
-                    group_num = group_idx + 1
-                    break
-            row[f'Week {week + 1}'] = group_num
-        data.append(row)
-    
-    return pd.DataFrame(data)
+    # Group number per (week, student), filled one group at a time
+    assignments = np.full((config.weeks, config.student_count), -1, dtype=np.int16)
+    for week, groups in enumerate(week_groups):
+        for group_idx, group in enumerate(groups):
+            assignments[week, group] = group_idx + 1
+    
+    df = pd.DataFrame({
+        'Student': [get_student_name(student, config) for student in range(config.student_count)],
+        **{f'Week {week + 1}': assignments[week] for week in range(config.weeks)}
+    })
+    
+    # Students left out of a week are shown as '-'
+    if (assignments < 0).any():
+        df = df.replace(-1, '-')
+    return df
+
+def _group_layout_columns(week_groups: WeekGroups) -> dict:
+    """Week, group number and size of every group as typed column arrays (one row per group)"""
+    groups_per_week = [len(groups) for groups in week_groups]
+    return {
+        'Week': np.repeat(np.arange(1, len(week_groups) + 1), groups_per_week),
+        'Group': np.concatenate([np.arange(1, count + 1) for count in groups_per_week]),
+        'Size': np.fromiter((len(group) for groups in week_groups for group in groups),
+                            dtype=np.int64, count=sum(groups_per_week))
+    }
 
-def create_group_details_dataframe(week_groups: List[List[List[int]]], config: GroupConfig) -> pd.DataFrame:
+def create_group_details_dataframe(week_groups: WeekGroups, config: GroupConfig) -> pd.DataFrame:
     """Create a detailed DataFrame showing group compositions"""
-    data = []
+    columns = _group_layout_columns(week_groups)
+    columns['Students'] = [
+        ', '.join(get_student_name(s, config) for s in group)
+        for groups in week_groups for group in groups
+    ]
     
-    for week_idx, groups in enumerate(week_groups):
-        for group_idx, group in enumerate(groups):
-            student_names = [get_student_name(s, config) for s in group]
-            data.append({
-                'Week': week_idx + 1,
-                'Group': group_idx + 1,
-                'Students': ', '.join(student_names),
-                'Size': len(group)
-            })
-    
-    return pd.DataFrame(data)
+    return pd.DataFrame(columns, columns=['Week', 'Group', 'Students', 'Size'])
 
+# Figures are cached as shared objects rather than pickled copies on every rerun
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
 def plot_statistics(stats: dict, config: GroupConfig) -> tuple:
     """Create visualizations for statistics"""
     
-    # Pair repetition histogram
-    repetition_counts = list(stats['all_pairs_count'].values())
-    fig1 = px.histogram(
-        x=repetition_counts,
-        nbins=max(repetition_counts) if repetition_counts else 1,
+    # Pair repetition histogram - bin on the server so Plotly only gets one bar per count
+    repetition_counts = np.fromiter(stats['all_pairs_count'].values(), dtype=np.int64)
+    pairs_per_count = np.bincount(repetition_counts)[1:]
+    fig1 = px.bar(
+        x=np.arange(1, len(pairs_per_count) + 1),
+        y=pairs_per_count,
         title="Distribution of Pair Repetitions",
         labels={'x': 'Number of Times Paired', 'y': 'Number of Pairs'}
     )
@@ -240,18 +553,10 @@ def plot_statistics(stats: dict, config: GroupConfig) -> tuple:
     
     return fig1, fig2
 
-def plot_group_sizes(week_groups: List[List[List[int]]], config: GroupConfig):
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def plot_group_sizes(week_groups: WeekGroups, config: GroupConfig):
     """Plot group sizes across weeks to verify consistency"""
-    week_data = []
-    for week_idx, groups in enumerate(week_groups):
-        for group_idx, group in enumerate(groups):
-            week_data.append({
-                'Week': week_idx + 1,
-                'Group': group_idx + 1,
-                'Size': len(group)
-            })
-    
-    df = pd.DataFrame(week_data)
+    df = pd.DataFrame(_group_layout_columns(week_groups))
     fig = px.box(df, x='Week', y='Size', title='Group Size Distribution by Week')
     fig.add_hline(y=config.group_size, line_dash="dash", line_color="red", 
                   annotation_text=f"Min Size: {config.group_size}")
@@ -271,12 +576,19 @@ def parse_student_names(names_text: str) -> List[str]:
     
     return names
 
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
 def to_excel(df1: pd.DataFrame, df2: pd.DataFrame) -> bytes:
     """Convert DataFrames to Excel file"""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df1.to_excel(writer, sheet_name='Student Groups', index=False)
-        df2.to_excel(writer, sheet_name='Group Details', index=False)
+    # constant_memory flushes each row as soon as the next one starts, so rows
+    # are written in order here rather than through pandas' column-wise writer
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    for sheet_name, df in (('Student Groups', df1), ('Group Details', df2)):
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, df.columns)
+        for row_idx, row in enumerate(df.itertuples(index=False), start=1):
+            worksheet.write_row(row_idx, 0, row)
+    workbook.close()
     return output.getvalue()
 
 def main():
@@ -375,13 +687,15 @@ def main():
             with st.spinner("Generating optimal groups..."):
                 config = GroupConfig(student_count, group_size, weeks, student_names)
                 generator = GroupGenerator(config)
-                week_groups = generator.generate_groups()
+                week_groups = freeze_week_groups(generator.generate_groups())
                 stats = generator.get_pair_statistics(week_groups)
                 
                 # Store results in session state
                 st.session_state.week_groups = week_groups
                 st.session_state.config = config
                 st.session_state.stats = stats
+                st.session_state.results_df = create_results_dataframe(week_groups, config)
+                st.session_state.details_df = create_group_details_dataframe(week_groups, config)
                 
             st.sidebar.success("✅ Groups generated successfully!")
             
@@ -397,18 +711,18 @@ def main():
         week_groups = st.session_state.week_groups
         config = st.session_state.config
         stats = st.session_state.stats
+        results_df = st.session_state.results_df
+        details_df = st.session_state.details_df
         
         # Create tabs for different views
         tab1, tab2, tab3, tab4 = st.tabs(["📋 Student View", "👥 Group View", "📊 Statistics", "💾 Download"])
         
         with tab1:
             st.header("Student Group Assignments")
-            results_df = create_results_dataframe(week_groups, config)
             st.dataframe(results_df, use_container_width=True)
         
         with tab2:
             st.header("Group Compositions by Week")
-            details_df = create_group_details_dataframe(week_groups, config)
             
             # Week selector
             selected_week = st.selectbox("Select Week to View:", range(1, config.weeks + 1))
@@ -472,23 +786,22 @@ def main():
                 st.subheader("🔄 All Repeated Pair Details")
                 st.caption("Note: Pairs may repeat across non-consecutive weeks - this is expected and unavoidable.")
                 
-                repeated_data = []
-                for (s1, s2), count in stats['repeated_pair_details'].items():
-                    repeated_data.append({
+                # Sort the pairs once up front so the DataFrame needs no sort
+                sorted_pairs = sorted(stats['repeated_pair_details'].items(), key=lambda item: -item[1])
+                pair_rows = [(*divmod(key, config.student_count), count) for key, count in sorted_pairs]
+                repeated_df = pd.DataFrame([
+                    {
                         'Student 1': get_student_name(s1, config),
                         'Student 2': get_student_name(s2, config),
                         'Times Paired': count
-                    })
-                
-                repeated_df = pd.DataFrame(repeated_data).sort_values('Times Paired', ascending=False)
+                    }
+                    for s1, s2, count in pair_rows
+                ])
                 st.dataframe(repeated_df, use_container_width=True)
         
         with tab4:
             st.header("💾 Download Results")
             
-            results_df = create_results_dataframe(week_groups, config)
-            details_df = create_group_details_dataframe(week_groups, config)
-            
             col1, col2 = st.columns(2)
             
             with col1: